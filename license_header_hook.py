@@ -5,11 +5,182 @@ Pre-commit hook for managing license headers in source files.
 
 __version__ = "0.1.0"
 
-import argparse
+import enum
 import os
+import re
+import stat
 import sys
-from datetime import datetime
-from pathlib import Path
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    import argparse
+
+# Hook runs are short-lived, so the year is read once per process
+_CURRENT_YEAR = time.localtime().tm_year
+
+# Maximum number of leading lines inspected when looking for a header
+MAX_HEADER_LINES = 256
+
+# Below this many files (or on a single CPU) thread start-up costs more than
+# overlapping the reads and writes saves, so files are processed serially
+PARALLEL_MIN_FILES = 1000
+
+# Stat cache of files known to carry the current header (used with --cache),
+# relative to the repository's git directory
+CACHE_NAME = os.path.join("hooks-cache", "license-header.json")
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode UTF-8 file content.
+
+    Line endings are normalized to ``\\n`` like text-mode ``open()`` does.
+    """
+    content = data.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _write_text_atomic(file_path: str, content: str) -> None:
+    """Write a UTF-8 file via a temporary file and ``os.replace``.
+
+    Newlines are written as ``os.linesep`` like text-mode ``open()`` does. An
+    existing target keeps its permissions, and symlinks are written through.
+    """
+    import tempfile
+
+    target = os.path.realpath(file_path)
+    try:
+        mode: int | None = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = None
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(target), prefix=f".{os.path.basename(target)}."
+    )
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _split_head(content: str) -> tuple[list[str], int, int] | None:
+    """Split the leading lines of ``content`` for header detection.
+
+    Returns ``(lines, start_idx, end)`` where ``start_idx`` is the first line
+    after a shebang and blank lines and ``end`` bounds the lines to scan, or
+    None if there is no such line.
+    """
+    offset = _skip_shebang_and_blanks(content)
+    if offset == len(content):
+        return None
+
+    # Headers live at the top, so only split the first lines; the last
+    # element holds the unsplit remainder of larger files
+    lines = content.split("\n", MAX_HEADER_LINES)
+    end = min(len(lines), MAX_HEADER_LINES)
+    start_idx = content.count("\n", 0, offset)
+    if start_idx >= end:
+        # Blank lines go past the scanned lines, so split the whole content
+        lines = content.split("\n")
+        end = len(lines)
+    return lines, start_idx, end
+
+
+def _skip_blank_lines(lines: list[str], idx: int, end: int) -> tuple[int, int]:
+    """Advance ``idx`` past blank lines, returning the new ``(idx, end)``.
+
+    If the blank lines reach ``end``, the unsplit remainder held in the last
+    element of ``lines`` is split in place and scanning continues.
+    """
+    while True:
+        while idx < end and not lines[idx].strip():
+            idx += 1
+        if idx < end or end >= len(lines):
+            return idx, end
+        lines[end:] = lines[end].split("\n")
+        end = len(lines)
+
+
+def _skip_shebang_and_blanks(content: str) -> int:
+    """Return the offset of the first character after a shebang and blank lines."""
+    i = 0
+    if content.startswith("#!"):
+        newline = content.find("\n")
+        if newline == -1:
+            return len(content)
+        i = newline + 1
+
+    n = len(content)
+    while i < n and content[i].isspace():
+        i += 1
+    return i
+
+
+class FileStatus(enum.Enum):
+    """Outcome of processing a single file."""
+
+    UPDATED = "updated"  # The header was added or replaced
+    CURRENT = "current"  # The file already has the current header
+    SKIPPED = "skipped"  # No comment style is registered for the file
+    FAILED = "failed"  # The file could not be read, decoded or written
+
+
+class CommentKind(enum.Enum):
+    """How a comment style delimits a header."""
+
+    SINGLE = "single"  # Every line carries the marker, e.g. "#"
+    MULTI = "multi"  # A block between start and end markers, e.g. "/* */"
+
+
+class CommentStyle(NamedTuple):
+    """Comment markers for a file type, with derived values precomputed."""
+
+    kind: CommentKind
+    start: str
+    middle: str
+    end: str
+    start_len: int
+    end_len: int
+    mid_stripped: str
+    mid_stripped_len: int
+    start_re: re.Pattern[str]
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[str, str]) -> "CommentStyle":
+        """Build a style from a ``{"start", "middle", "end"}`` mapping."""
+        start, middle, end = mapping["start"], mapping["middle"], mapping["end"]
+        mid_stripped = middle.strip()
+        return cls(
+            kind=(CommentKind.SINGLE if start == middle == end else CommentKind.MULTI),
+            start=start,
+            middle=middle,
+            end=end,
+            start_len=len(start),
+            end_len=len(end),
+            mid_stripped=mid_stripped,
+            mid_stripped_len=len(mid_stripped),
+            # Matches a line opening with the start marker after indentation
+            start_re=re.compile(r"\s*" + re.escape(start)),
+        )
+
+    @classmethod
+    def of(cls, style: "CommentStyle | Mapping[str, str]") -> "CommentStyle":
+        """Return ``style`` as a CommentStyle, converting plain mappings."""
+        if isinstance(style, CommentStyle):
+            return style
+        return cls.from_mapping(style)
 
 
 class CommentRegistry:
@@ -59,15 +230,34 @@ class CommentRegistry:
         ".tf": {"start": "#", "middle": "#", "end": "#"},
     }
 
+    # Converted once and shared read-only by every registry without overrides
+    _DEFAULT_STYLES: Mapping[str, CommentStyle] = MappingProxyType(
+        {
+            ext: CommentStyle.from_mapping(style)
+            for ext, style in DEFAULT_MAPPINGS.items()
+        }
+    )
+
     def __init__(self, custom_mappings: dict | None = None):
-        self.mappings = self.DEFAULT_MAPPINGS.copy()
+        self.mappings: Mapping[str, CommentStyle] = self._DEFAULT_STYLES
         if custom_mappings:
-            self.mappings.update(custom_mappings)
+            mappings = dict(self._DEFAULT_STYLES)
+            for ext, style in custom_mappings.items():
+                mappings[ext] = CommentStyle.of(style)
+            self.mappings = mappings
 
-    def get_comment_style(self, file_path: str) -> dict[str, str] | None:
+    def get_comment_style(self, file_path: str) -> CommentStyle | None:
         """Get comment style for a file based on its extension."""
-        ext = Path(file_path).suffix.lower()
-        return self.mappings.get(ext)
+        dot = file_path.rfind(".")
+        # A dot must be inside the file name and not lead it (".bashrc")
+        sep = max(file_path.rfind("/"), file_path.rfind(os.sep))
+        if dot <= sep + 1:
+            return None
+        ext = file_path[dot:]
+        comment_style = self.mappings.get(ext)
+        if comment_style is None:
+            comment_style = self.mappings.get(ext.lower())
+        return comment_style
 
 
 class LicenseHeaderManager:
@@ -82,171 +272,213 @@ class LicenseHeaderManager:
         self.template_file = template_file
         self.copyright_holder = copyright_holder
         self.comment_registry = comment_registry
-        self.current_year = datetime.now().year
+        self.current_year = _CURRENT_YEAR
+        self._template: str | None = None
+        self._formatted: dict[str, str] = {}
+        self._header_cache: dict[CommentStyle, str] = {}
+        self._header_bytes_cache: dict[CommentStyle, bytes] = {}
+        self._lock = threading.Lock()
 
     def load_template(self) -> str:
-        """Load the license header template."""
-        try:
-            with open(self.template_file, encoding="utf-8") as f:
-                return f.read().strip()
-        except FileNotFoundError as e:
-            raise FileNotFoundError(
-                f"Template file not found: {self.template_file}"
-            ) from e
+        """Load the license header template (read once and cached)."""
+        if self._template is None:
+            try:
+                with open(self.template_file, encoding="utf-8") as f:
+                    self._template = f.read().strip()
+            except FileNotFoundError as e:
+                raise FileNotFoundError(
+                    f"Template file not found: {self.template_file}"
+                ) from e
+        return self._template
 
     def format_template(self, template: str) -> str:
         """Format template with current year and copyright holder."""
-        return template.format(
-            year=self.current_year, copyright_holder=self.copyright_holder
-        )
-
-    def create_header_comment(self, content: str, comment_style: dict[str, str]) -> str:
+        formatted = self._formatted.get(template)
+        if formatted is None:
+            formatted = template.format(
+                year=self.current_year, copyright_holder=self.copyright_holder
+            )
+            self._formatted[template] = formatted
+        return formatted
+
+    def get_header(self, comment_style: CommentStyle | dict[str, str]) -> str:
+        """Get the commented license header for a comment style (cached)."""
+        key = CommentStyle.of(comment_style)
+        header = self._header_cache.get(key)
+        if header is None:
+            # Files may be processed from several threads at once
+            with self._lock:
+                header = self._header_cache.get(key)
+                if header is None:
+                    header = self.create_header_comment(
+                        self.format_template(self.load_template()), key
+                    )
+                    self._header_bytes_cache[key] = header.encode("utf-8")
+                    self._header_cache[key] = header
+        return header
+
+    def get_header_bytes(self, comment_style: CommentStyle | dict[str, str]) -> bytes:
+        """Get the UTF-8 encoded license header for a comment style (cached)."""
+        key = CommentStyle.of(comment_style)
+        header_bytes = self._header_bytes_cache.get(key)
+        if header_bytes is None:
+            self.get_header(key)
+            header_bytes = self._header_bytes_cache[key]
+        return header_bytes
+
+    def create_header_comment(
+        self, content: str, comment_style: CommentStyle | dict[str, str]
+    ) -> str:
         """Create a commented header from content."""
+        cs = CommentStyle.of(comment_style)
         lines = content.split("\n")
 
-        if comment_style["start"] == comment_style["middle"] == comment_style["end"]:
+        if cs.kind is CommentKind.SINGLE:
             # Single-line comment style (e.g., # for Python)
+            prefix = cs.start + " "
+            bare = cs.start.rstrip()
             return "\n".join(
-                f"{comment_style['start']} {line}".rstrip() for line in lines
+                [prefix + text if (text := line.rstrip()) else bare for line in lines]
             )
         else:
             # Multi-line comment style (e.g., /* */ for C/Java)
-            result = [comment_style["start"]]
-            gap = ' ' if comment_style["middle"] != '' else ''
-            for line in lines:
-                result.append(f"{comment_style['middle']}{gap}{line}".rstrip())
-            result.append(comment_style["end"])
+            prefix = cs.middle + " " if cs.middle else ""
+            bare = cs.middle.rstrip()
+            result = [cs.start]
+            result += [
+                prefix + text if (text := line.rstrip()) else bare for line in lines
+            ]
+            result.append(cs.end)
             return "\n".join(result)
 
     def extract_existing_header(
-        self, file_content: str, comment_style: dict[str, str]
+        self, file_content: str, comment_style: CommentStyle | dict[str, str]
     ) -> str | None:
         """Extract existing license header from file content."""
-        lines = file_content.split("\n")
+        cs = CommentStyle.of(comment_style)
+        located = self._locate_header(file_content, cs)
+        if located is None:
+            return None
 
-        # Skip shebang if present
-        start_idx = 0
-        if lines and lines[0].startswith("#!"):
-            start_idx = 1
+        header_lines = located[3]
+        return "\n".join(header_lines) if header_lines else None
 
-        # Skip empty lines
-        while start_idx < len(lines) and not lines[start_idx].strip():
-            start_idx += 1
+    def _locate_header(
+        self, file_content: str, cs: CommentStyle
+    ) -> tuple[list[str], int, int, list[str]] | None:
+        """Split the leading lines and find the header lines among them.
 
-        if start_idx >= len(lines):
+        Returns ``(lines, start_idx, end, header_lines)`` as for
+        ``_split_head``, or None if the content has no non-blank line.
+        """
+        head = _split_head(file_content)
+        if head is None:
             return None
 
+        lines, start_idx, end = head
+        header_lines, complete = self._find_header_lines(lines, start_idx, end, cs)
+        if not complete and end < len(lines):
+            # The header runs past the scanned lines, so split the whole file
+            lines = file_content.split("\n")
+            end = len(lines)
+            header_lines, _ = self._find_header_lines(lines, start_idx, end, cs)
+        return lines, start_idx, end, header_lines
+
+    def _find_header_lines(
+        self, lines: list[str], start_idx: int, end: int, cs: CommentStyle
+    ) -> tuple[list[str], bool]:
+        """Find the header lines starting at ``start_idx`` (empty if none).
+
+        The flag is False when the header was still open at ``end``.
+        """
         # Check if we have a comment block starting
-        first_line = lines[start_idx].strip()
+        if not cs.start_re.match(lines[start_idx]):
+            return [], True
 
-        if comment_style["start"] == comment_style["middle"]:
+        header_lines = []
+        if cs.kind is CommentKind.SINGLE:
             # Single-line comments
-            if not first_line.startswith(comment_style["start"]):
-                return None
-
-            header_lines = []
-            for i in range(start_idx, len(lines)):
-                line = lines[i].strip()
-                if line.startswith(comment_style["start"]):
-                    header_lines.append(line)
-                elif not line:  # Empty line
-                    continue
-                else:
-                    break
-
-            return "\n".join(header_lines) if header_lines else None
-
+            for i in range(start_idx, end):
+                line = lines[i]
+                if cs.start_re.match(line):
+                    header_lines.append(line.strip())
+                elif line and not line.isspace():
+                    return header_lines, True
         else:
             # Multi-line comments
-            if not first_line.startswith(comment_style["start"]):
-                return None
-
-            header_lines = []
-
-            for i in range(start_idx, len(lines)):
+            for i in range(start_idx, end):
                 line = lines[i].strip()
                 header_lines.append(lines[i])
 
-                if comment_style["end"] in line:
-                    break
+                if cs.end in line:
+                    return header_lines, True
 
-            return "\n".join(header_lines) if header_lines else None
+        return header_lines, False
 
     def _extract_header_content(
-        self, header: str, comment_style: dict[str, str]
+        self, header: str, comment_style: CommentStyle | dict[str, str]
     ) -> str:
         """Extract the actual content from a commented header."""
+        cs = CommentStyle.of(comment_style)
         lines = header.split("\n")
         content_lines = []
 
-        if comment_style["start"] == comment_style["middle"]:
+        if cs.kind is CommentKind.SINGLE:
             # Single-line comments - remove comment prefix
             for line in lines:
                 stripped = line.strip()
-                if stripped.startswith(comment_style["start"]):
-                    content = stripped[len(comment_style["start"]):].strip()
+                if stripped.startswith(cs.start):
+                    content = stripped[cs.start_len :].strip()
                     content_lines.append(content)
         else:
             # Multi-line comments - remove comment markers
             for i, line in enumerate(lines):
                 stripped = line.strip()
-                if i == 0 and stripped.startswith(comment_style["start"]):
+                if i == 0 and stripped.startswith(cs.start):
                     # First line with start marker
-                    content = stripped[len(comment_style["start"]):].strip()
+                    content = stripped[cs.start_len :].strip()
                     if content:
                         content_lines.append(content)
-                elif stripped.endswith(comment_style["end"]):
+                elif stripped.endswith(cs.end):
                     # Last line with end marker
-                    content = stripped[: -len(comment_style["end"])].strip()
-                    if content.startswith(comment_style["middle"].strip()):
-                        content = content[
-                            len(comment_style["middle"].strip()):
-                        ].strip()
+                    content = stripped[: -cs.end_len].strip()
+                    if content.startswith(cs.mid_stripped):
+                        content = content[cs.mid_stripped_len :].strip()
                     if content:
                         content_lines.append(content)
                     break
-                elif stripped.startswith(comment_style["middle"].strip()):
+                elif stripped.startswith(cs.mid_stripped):
                     # Middle line
-                    content = stripped[len(
-                        comment_style["middle"].strip()):].strip()
+                    content = stripped[cs.mid_stripped_len :].strip()
                     content_lines.append(content)
 
         return "\n".join(content_lines)
 
     def remove_existing_header(
-        self, file_content: str, comment_style: dict[str, str]
+        self, file_content: str, comment_style: CommentStyle | dict[str, str]
     ) -> str:
         """Remove existing license header from file content."""
-        # First, check if there's actually a header to remove
-        existing_header = self.extract_existing_header(
-            file_content, comment_style)
-        if not existing_header:
+        cs = CommentStyle.of(comment_style)
+        located = self._locate_header(file_content, cs)
+        if located is None:
             return file_content
 
-        lines = file_content.split("\n")
-        header_lines = existing_header.split("\n")
+        # First, check if there's actually a header to remove; the lines are
+        # split once and shared with the header detection
+        lines, start_idx, end, header_lines = located
+        if not header_lines:
+            return file_content
 
         # Preserve shebang
-        start_idx = 0
-        preserved_lines = []
-        if lines and lines[0].startswith("#!"):
-            preserved_lines.append(lines[0])
-            start_idx = 1
-
-        # Skip empty lines before header
-        while start_idx < len(lines) and not lines[start_idx].strip():
-            start_idx += 1
-
-        if start_idx >= len(lines):
-            return file_content
+        preserved_lines = [lines[0]] if file_content.startswith("#!") else []
 
         # Remove the exact header lines that were detected
-        if comment_style["start"] == comment_style["middle"]:
+        if cs.kind is CommentKind.SINGLE:
             # Single-line comments - remove exact matching header lines
             header_end_idx = start_idx
             for expected_line in header_lines:
                 if (
-                    header_end_idx < len(lines)
+                    header_end_idx < end
                     and lines[header_end_idx].strip() == expected_line.strip()
                 ):
                     header_end_idx += 1
@@ -254,118 +486,300 @@ class LicenseHeaderManager:
                     break
 
             # Skip empty lines after header
-            while header_end_idx < len(lines) and not lines[header_end_idx].strip():
-                header_end_idx += 1
-
-            start_idx = header_end_idx
+            start_idx, end = _skip_blank_lines(lines, header_end_idx, end)
         else:
             # Multi-line comments - find the end of the specific header block
-            first_line = lines[start_idx].strip()
-            if first_line.startswith(comment_style["start"]):
-                while start_idx < len(lines):
+            if cs.start_re.match(lines[start_idx]):
+                while start_idx < end:
                     line = lines[start_idx]
                     start_idx += 1
-                    if comment_style["end"] in line:
+                    if cs.end in line:
                         break
 
                 # Skip empty lines after header
-                while start_idx < len(lines) and not lines[start_idx].strip():
-                    start_idx += 1
+                start_idx, end = _skip_blank_lines(lines, start_idx, end)
 
         # Return preserved lines + remaining content
-        remaining_lines = lines[start_idx:] if start_idx < len(lines) else []
+        remaining_lines = lines[start_idx:]
         return "\n".join(preserved_lines + remaining_lines)
 
+    def has_current_header(
+        self, file_content: bytes, comment_style: CommentStyle | dict[str, str]
+    ) -> bool:
+        """Check whether the raw file starts with exactly the current header.
+
+        Only the header region is compared, so files that are already up to
+        date can be skipped without decoding or splitting the whole content.
+        """
+        cs = CommentStyle.of(comment_style)
+        header = self.get_header_bytes(cs)
+        offset = 0
+        if file_content.startswith(b"#!"):
+            newline = file_content.find(b"\n")
+            if newline == -1:
+                return False
+            offset = newline + 1
+
+        end = offset + len(header)
+        if not (
+            file_content.startswith(header, offset)
+            and file_content[end : end + 1] == b"\n"
+        ):
+            return False
+
+        if cs.kind is CommentKind.SINGLE:
+            # A comment line right after the header means stale header lines
+            # are left over, which only the full rewrite removes
+            line_end = file_content.find(b"\n", end + 1)
+            next_line = file_content[end + 1 : line_end if line_end != -1 else None]
+            if cs.start_re.match(next_line.decode("utf-8", "replace")):
+                return False
+
+        return True
+
     def process_file(self, file_path: str) -> bool:
         """Process a single file to add/update license header."""
+        return self.update_file(file_path) is FileStatus.UPDATED
+
+    def update_file(self, file_path: str) -> FileStatus:
+        """Add or update the license header of a file and report the outcome."""
         comment_style = self.comment_registry.get_comment_style(file_path)
         if not comment_style:
             print(f"Skipping {file_path}: No comment style registered")
-            return False
+            return FileStatus.SKIPPED
 
         try:
-            with open(file_path, encoding="utf-8") as f:
-                original_content = f.read()
+            with open(file_path, "rb") as f:
+                raw_content = f.read()
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
-            return False
+            return FileStatus.FAILED
 
-        # Load and format template
-        template = self.load_template()
-        formatted_template = self.format_template(template)
-        new_header = self.create_header_comment(
-            formatted_template, comment_style)
+        # Nothing to do if the current header already sits at the top; this is
+        # checked on the raw bytes so up-to-date files are never decoded
+        if self.has_current_header(raw_content, comment_style):
+            return FileStatus.CURRENT
 
-        # TODO: Add optimization to check if existing header is already correct
+        try:
+            original_content = _decode_text(raw_content)
+        except UnicodeDecodeError as e:
+            print(f"Error reading {file_path}: {e}")
+            return FileStatus.FAILED
+
+        new_header = self.get_header(comment_style)
 
         # Remove existing header if present
         content_without_header = self.remove_existing_header(
             original_content, comment_style
         )
 
-        # Create new content with header
+        # Create new content with header, joined once from its parts
+        parts = []
+        remaining_content = content_without_header
+
         # Check if original content starts with shebang
-        lines = original_content.split("\n")
-        if lines and lines[0].startswith("#!"):
+        if original_content.startswith("#!"):
             # Preserve shebang at the top
-            shebang = lines[0]
-            remaining_content = content_without_header
+            newline = original_content.find("\n")
+            shebang = original_content[:newline] if newline != -1 else original_content
             if remaining_content.startswith(shebang):
-                remaining_content = remaining_content[len(
-                    shebang):].lstrip("\n")
-
-            remaining_content = remaining_content.lstrip("\n")
-            if remaining_content:
-                new_content = shebang + "\n" + new_header + "\n" + remaining_content
-            else:
-                new_content = shebang + "\n" + new_header + "\n"
-        else:
-            remaining_content = content_without_header.lstrip("\n")
-            if remaining_content:
-                new_content = new_header + "\n" + remaining_content
-            else:
-                new_content = new_header + "\n"
+                remaining_content = remaining_content[len(shebang) :]
+            parts += [shebang, "\n"]
+
+        parts += [new_header, "\n"]
+        remaining_content = remaining_content.lstrip("\n")
+        if remaining_content:
+            parts.append(remaining_content)
+        new_content = "".join(parts)
 
         # Write back if changed
         if new_content != original_content:
             try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(new_content)
+                _write_text_atomic(file_path, new_content)
                 print(f"Updated license header in {file_path}")
-                return True
+                return FileStatus.UPDATED
             except Exception as e:
                 print(f"Error writing {file_path}: {e}")
-                return False
-
-        return False
+                return FileStatus.FAILED
+
+        return FileStatus.CURRENT
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a glob pattern into a regex with ``Path.match`` semantics.
+
+    Wildcards never cross a ``/`` and relative patterns are anchored at a
+    path component boundary on the right, so ``*.py`` matches ``a/b.py``.
+    """
+    result = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            result.append("[^/]*")
+        elif c == "?":
+            result.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            j = pattern.find("]", j)
+            if j < 0:
+                result.append("\\[")
+                continue
+            result.append(_translate_set(pattern[i:j]))
+            i = j + 1
+        else:
+            result.append(re.escape(c))
+
+    anchor = r"\A" if pattern.startswith("/") else r"(?:\A|/)"
+    return f"{anchor}(?:{''.join(result)})\\Z"
+
+
+def _translate_set(stuff: str) -> str:
+    """Translate the inside of a glob ``[...]`` set like ``fnmatch`` does.
+
+    Empty and reversed ranges are dropped rather than rejected by ``re``, and
+    characters with a special meaning inside regex sets are escaped.
+    """
+    # Split on range hyphens; a hyphen at either end of the set is literal
+    chunks = []
+    i = 0
+    k = 2 if stuff.startswith("!") else 1
+    while True:
+        k = stuff.find("-", k)
+        if k < 0:
+            break
+        chunks.append(stuff[i:k])
+        i = k + 1
+        k += 3
+    chunk = stuff[i:]
+    if chunk:
+        chunks.append(chunk)
+    else:
+        chunks[-1] += "-"
+
+    # Remove empty ranges, which are invalid in a regex
+    for k in range(len(chunks) - 1, 0, -1):
+        if chunks[k - 1][-1] > chunks[k][0]:
+            chunks[k - 1] = chunks[k - 1][:-1] + chunks[k][1:]
+            del chunks[k]
+
+    # Escape backslashes, literal hyphens, brackets and set operations
+    stuff = "-".join(re.sub(r"([\\\-\[\]&~|])", r"\\\1", c) for c in chunks)
+    if not stuff:
+        return "(?!)"
+    # Like "?", negated sets never match the path separator
+    if stuff.startswith("!"):
+        return f"[^/{stuff[1:]}]"
+    if stuff.startswith("^"):
+        stuff = "\\" + stuff
+    return f"[{stuff}]"
+
+
+def compile_patterns(patterns: list[str]) -> re.Pattern[str] | None:
+    """Compile glob patterns into a single regex, or None if there are none."""
+    if not patterns:
+        return None
+    return re.compile("|".join(_glob_to_regex(p) for p in patterns), re.DOTALL)
 
 
 def should_process_file(
-    file_path: str, include_patterns: list[str], exclude_patterns: list[str]
+    file_path: str,
+    include_re: re.Pattern[str] | None,
+    exclude_re: re.Pattern[str] | None,
 ) -> bool:
     """Check if file should be processed based on include/exclude patterns."""
-    path = Path(file_path)
+    if os.sep != "/":
+        file_path = file_path.replace(os.sep, "/")
 
     # Check exclude patterns first
-    for pattern in exclude_patterns:
-        if path.match(pattern):
-            return False
+    if exclude_re is not None and exclude_re.search(file_path):
+        return False
 
     # If no include patterns, process all (except excluded)
-    if not include_patterns:
-        return True
+    return include_re is None or include_re.search(file_path) is not None
 
-    # Check include patterns
-    for pattern in include_patterns:
-        if path.match(pattern):
-            return True
 
-    return False
+def _cache_fingerprint(header_manager: LicenseHeaderManager) -> str:
+    """Identify the header a cache was built for, so stale caches are dropped."""
+    import hashlib
 
+    formatted = header_manager.format_template(header_manager.load_template())
+    return hashlib.sha256(f"{__version__}\0{formatted}".encode()).hexdigest()
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="Pre-commit hook for license headers")
+
+def _cache_file() -> str | None:
+    """Locate the cache file in the git directory of the current repository.
+
+    ``.git`` is a directory in a normal checkout and a ``gitdir:`` pointer file
+    in worktrees and submodules. Returns None outside a repository root.
+    """
+    git_dir = ".git"
+    if not os.path.isdir(git_dir):
+        try:
+            with open(git_dir, encoding="utf-8") as f:
+                line = f.readline()
+        except OSError:
+            return None
+        if not line.startswith("gitdir:"):
+            return None
+        git_dir = line[len("gitdir:") :].strip()
+        if not os.path.isdir(git_dir):
+            return None
+    return os.path.join(git_dir, CACHE_NAME)
+
+
+def _load_cache(cache_file: str, fingerprint: str) -> dict[str, list[int]]:
+    """Load the file stat cache, or an empty one if missing or stale."""
+    import json
+
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _save_cache(
+    cache_file: str, fingerprint: str, updates: dict[str, list[int]]
+) -> None:
+    """Merge new entries into the file stat cache, ignoring write failures.
+
+    pre-commit may run several batches of the hook at once, so the cache is
+    re-read just before saving and replaced atomically. Entries for files that
+    no longer exist are dropped so the cache does not grow without bound.
+    """
+    import json
+
+    files = {
+        path: entry
+        for path, entry in _load_cache(cache_file, fingerprint).items()
+        if path not in updates and os.path.isfile(path)
+    }
+    files.update(updates)
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        _write_text_atomic(
+            cache_file, json.dumps({"fingerprint": fingerprint, "files": files})
+        )
+    except OSError as e:
+        print(f"Error writing cache {cache_file}: {e}")
+
+
+def _build_parser() -> "argparse.ArgumentParser":
+    """Build the argparse parser, used only for help and usage errors."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-commit hook for license headers")
     parser.add_argument("files", nargs="*", help="Files to process")
     parser.add_argument(
         "--template", "-t", required=True, help="License header template file"
@@ -387,8 +801,143 @@ def main() -> int:
         default=[],
         help="File patterns to exclude (can be used multiple times)",
     )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Skip files unchanged since the last run (stored in the git directory)",
+    )
+    return parser
+
+
+class Arguments(NamedTuple):
+    """Parsed command line arguments."""
+
+    files: list[str]
+    template: str
+    copyright_holder: str
+    include: list[str]
+    exclude: list[str]
+    cache: bool
+
+
+# Options taking a value, mapped to their destination
+_VALUE_OPTIONS = {
+    "-t": "template",
+    "--template": "template",
+    "-c": "copyright_holder",
+    "--copyright-holder": "copyright_holder",
+    "-i": "include",
+    "--include": "include",
+    "-e": "exclude",
+    "--exclude": "exclude",
+}
+
+# Long options, which like argparse may be abbreviated to any unique prefix
+_LONG_OPTIONS = (
+    "--help",
+    "--template",
+    "--copyright-holder",
+    "--include",
+    "--exclude",
+    "--cache",
+    "--no-cache",
+)
+
+
+def _expand_long_option(option: str) -> str:
+    """Expand a unique prefix of a long option to its full name."""
+    if option in _LONG_OPTIONS:
+        return option
+    matches = [name for name in _LONG_OPTIONS if name.startswith(option)]
+    if len(matches) > 1:
+        _build_parser().error(
+            f"ambiguous option: {option} could match {', '.join(matches)}"
+        )
+    return matches[0] if matches else option
+
+
+def parse_args(argv: list[str]) -> Arguments:
+    """Parse command line arguments.
+
+    The interface is small, so arguments are parsed by hand to keep argparse
+    off the startup path; it is only imported for ``--help`` and usage errors.
+    """
+    files: list[str] = []
+    values: dict[str, str] = {}
+    patterns: dict[str, list[str]] = {"include": [], "exclude": []}
+    cache = False
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+
+        if arg == "--":
+            files.extend(argv[i:])
+            break
+        if not arg.startswith("-") or arg == "-":
+            files.append(arg)
+            continue
 
-    args = parser.parse_args()
+        # Accept "--option value", "--option=value", "-o value" and "-ovalue"
+        if arg.startswith("--"):
+            option, separator, value = arg.partition("=")
+            option = _expand_long_option(option)
+            has_value = bool(separator)
+            if option in ("--cache", "--no-cache") and not has_value:
+                cache = option == "--cache"
+                continue
+        else:
+            option, value = arg[:2], arg[2:]
+            has_value = bool(value)
+            # Like argparse, "-t=value" is the same as "-tvalue"
+            if value.startswith("="):
+                value = value[1:]
+
+        if option in ("-h", "--help") and not has_value:
+            _build_parser().print_help()
+            sys.exit(0)
+
+        dest = _VALUE_OPTIONS.get(option)
+        if dest is None:
+            _build_parser().error(f"unrecognized arguments: {arg}")
+        if not has_value:
+            if i >= len(argv):
+                _build_parser().error(f"argument {option}: expected one argument")
+            value = argv[i]
+            i += 1
+
+        if dest in patterns:
+            patterns[dest].append(value)
+        else:
+            values[dest] = value
+
+    missing = [
+        option
+        for option, dest in (
+            ("--template/-t", "template"),
+            ("--copyright-holder/-c", "copyright_holder"),
+        )
+        if dest not in values
+    ]
+    if missing:
+        _build_parser().error(
+            f"the following arguments are required: {', '.join(missing)}"
+        )
+
+    return Arguments(
+        files=files,
+        template=values["template"],
+        copyright_holder=values["copyright_holder"],
+        include=patterns["include"],
+        exclude=patterns["exclude"],
+        cache=cache,
+    )
+
+
+def main() -> int:
+    args = parse_args(sys.argv[1:])
 
     # Initialize components
     comment_registry = CommentRegistry()
@@ -396,18 +945,74 @@ def main() -> int:
         args.template, args.copyright_holder, comment_registry
     )
 
-    # Process files
-    modified_files = []
+    include_re = compile_patterns(args.include)
+    exclude_re = compile_patterns(args.exclude)
 
+    # The cache lives in the git directory, so it is only used from a
+    # repository root
+    cache_file = _cache_file() if args.cache else None
+    fingerprint = _cache_fingerprint(header_manager) if cache_file else ""
+    cache = _load_cache(cache_file, fingerprint) if cache_file else {}
+    verified: dict[str, list[int]] = {}
+
+    # Drop duplicate paths, then group files by extension so files sharing a
+    # comment style are handled together
+    seen = set()
+    candidates = []
     for file_path in args.files:
-        if not os.path.isfile(file_path):
+        real_path = os.path.realpath(file_path)
+        if real_path not in seen:
+            seen.add(real_path)
+            candidates.append(file_path)
+    candidates.sort(key=lambda path: os.path.splitext(path)[1])
+
+    # Select files
+    files = []
+    stats = {}
+
+    for file_path in candidates:
+        if not should_process_file(file_path, include_re, exclude_re):
             continue
 
-        if not should_process_file(file_path, args.include, args.exclude):
+        # A single stat both filters out non-regular files and feeds the cache
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
             continue
 
-        if header_manager.process_file(file_path):
+        if cache_file:
+            stats[file_path] = [st.st_mtime_ns, st.st_size]
+            if cache.get(file_path) == stats[file_path]:
+                continue
+
+        files.append(file_path)
+
+    # Process files; this is I/O bound, so large batches use threads to
+    # overlap the reads and writes
+    modified_files = []
+    cpu_count = os.cpu_count() or 1
+
+    if len(files) < PARALLEL_MIN_FILES or cpu_count == 1:
+        statuses = [header_manager.update_file(file_path) for file_path in files]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(32, cpu_count * 4)) as executor:
+            statuses = list(executor.map(header_manager.update_file, files))
+
+    for file_path, status in zip(files, statuses, strict=True):
+        if status is FileStatus.UPDATED:
             modified_files.append(file_path)
+        elif status is FileStatus.CURRENT and cache_file:
+            # Only files verified to carry the header are cached, so
+            # errors are retried and reported on the next run
+            verified[file_path] = stats[file_path]
+
+    # Runs that verified nothing new leave the cache as it is
+    if cache_file and verified:
+        _save_cache(cache_file, fingerprint, verified)
 
     # Return appropriate exit code
     if modified_files:
@@ -1,15 +1,25 @@
 """Tests for license_header_hook module."""
 
+import json
 import os
+import stat
 import tempfile
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
 from license_header_hook import (
+    CACHE_NAME,
+    MAX_HEADER_LINES,
+    CommentKind,
     CommentRegistry,
+    CommentStyle,
+    FileStatus,
     LicenseHeaderManager,
+    compile_patterns,
     main,
+    parse_args,
     should_process_file,
 )
 
@@ -23,11 +33,17 @@ class TestCommentRegistry:
 
         # Test Python
         python_style = registry.get_comment_style("test.py")
-        assert python_style == {"start": "#", "middle": "#", "end": "#"}
+        assert python_style == CommentStyle.from_mapping(
+            {"start": "#", "middle": "#", "end": "#"}
+        )
+        assert python_style.kind is CommentKind.SINGLE
 
         # Test JavaScript
         js_style = registry.get_comment_style("test.js")
-        assert js_style == {"start": "/*", "middle": " *", "end": " */"}
+        assert js_style == CommentStyle.from_mapping(
+            {"start": "/*", "middle": " *", "end": " */"}
+        )
+        assert js_style.kind is CommentKind.MULTI
 
         # Test unknown extension
         unknown_style = registry.get_comment_style("test.unknown")
@@ -39,7 +55,42 @@ class TestCommentRegistry:
         registry = CommentRegistry(custom)
 
         custom_style = registry.get_comment_style("test.custom")
-        assert custom_style == {"start": "//", "middle": "//", "end": "//"}
+        assert custom_style == CommentStyle.from_mapping(
+            {"start": "//", "middle": "//", "end": "//"}
+        )
+
+    def test_default_mappings_shared(self):
+        """Test that registries without overrides share the default styles."""
+        registry = CommentRegistry()
+
+        assert registry.mappings is CommentRegistry().mappings
+        with pytest.raises(TypeError):
+            registry.mappings[".new"] = registry.mappings[".py"]
+
+        # Overrides get their own mapping and leave the defaults untouched
+        custom = CommentRegistry({".py": {"start": "//", "middle": "//", "end": "//"}})
+        assert custom.get_comment_style("a.py").start == "//"
+        assert registry.get_comment_style("a.py").start == "#"
+
+    def test_comment_style_precomputed_fields(self):
+        """Test that derived comment style values are precomputed."""
+        style = CommentStyle.from_mapping({"start": "/*", "middle": " *", "end": " */"})
+
+        assert style.start_len == 2
+        assert style.end_len == 3
+        assert style.mid_stripped == "*"
+        assert style.mid_stripped_len == 1
+        assert CommentStyle.of(style) is style
+
+    def test_extension_lookup_edge_cases(self):
+        """Test extension detection on unusual paths."""
+        registry = CommentRegistry()
+
+        assert registry.get_comment_style("SRC/MAIN.PY") is not None
+        assert registry.get_comment_style("pkg/a.b.ts") is not None
+        assert registry.get_comment_style("dir.py/Makefile") is None
+        assert registry.get_comment_style("conf/.yml") is None
+        assert registry.get_comment_style("noext") is None
 
 
 class TestLicenseHeaderManager:
@@ -73,6 +124,18 @@ class TestLicenseHeaderManager:
         assert str(self.manager.current_year) in formatted
         assert "Test Corp" in formatted
 
+    def test_get_header_cached(self):
+        """Test that the template is read once and headers are cached per style."""
+        comment_style = {"start": "#", "middle": "#", "end": "#"}
+        header = self.manager.get_header(comment_style)
+
+        # Changing the template on disk must not trigger a re-read
+        with open(self.template_file, "w") as f:
+            f.write("Something else")
+
+        assert self.manager.get_header(dict(comment_style)) is header
+        assert header.startswith("# Copyright (c)")
+
     def test_create_header_comment_single_line(self):
         """Test creating header with single-line comments."""
         content = "Line 1\nLine 2"
@@ -98,25 +161,145 @@ class TestShouldProcessFile:
 
     def test_no_patterns(self):
         """Test processing when no patterns are specified."""
-        assert should_process_file("test.py", [], [])
+        assert should_process_file("test.py", None, None)
 
     def test_include_patterns(self):
         """Test include pattern matching."""
-        assert should_process_file("test.py", ["*.py"], [])
-        assert not should_process_file("test.js", ["*.py"], [])
+        include = compile_patterns(["*.py"])
+        assert should_process_file("test.py", include, None)
+        assert not should_process_file("test.js", include, None)
 
     def test_exclude_patterns(self):
         """Test exclude pattern matching."""
-        assert not should_process_file("test.py", [], ["*.py"])
-        assert should_process_file("test.js", [], ["*.py"])
+        exclude = compile_patterns(["*.py"])
+        assert not should_process_file("test.py", None, exclude)
+        assert should_process_file("test.js", None, exclude)
 
     def test_include_and_exclude_patterns(self):
         """Test both include and exclude patterns."""
+        include = compile_patterns(["*.py"])
+        exclude = compile_patterns(["test.py"])
+
         # Excluded files should not be processed even if they match include
-        assert not should_process_file("test.py", ["*.py"], ["test.py"])
+        assert not should_process_file("test.py", include, exclude)
 
         # Files matching include but not exclude should be processed
-        assert should_process_file("other.py", ["*.py"], ["test.py"])
+        assert should_process_file("other.py", include, exclude)
+
+    def test_patterns_match_like_path_match(self):
+        """Test that compiled patterns follow Path.match semantics."""
+        cases = [
+            ("src/pkg/test.py", "*.py"),
+            ("src/pkg/test.py", "test.py"),
+            ("src/pkg/test.py", "pkg/*.py"),
+            ("src/pkg/test.py", "src/*.py"),
+            ("src/pkg/test.py", "/src/pkg/*.py"),
+            ("/src/pkg/test.py", "/src/pkg/*.py"),
+            ("src/pkg/mytest.py", "test.py"),
+            ("src/pkg/test1.py", "test[0-9].py"),
+            ("src/pkg/testa.py", "test[!0-9].py"),
+            ("src/pkg/test.py", "t?st.py"),
+            ("src/pkg/a.py", "[z-a].py"),
+            ("src/pkg/[x].py", "[[]x].py"),
+            ("src/pkg/&.py", "[&&].py"),
+            ("src/pkg/!.py", "[!]].py"),
+        ]
+        for file_path, pattern in cases:
+            expected = Path(file_path).match(pattern)
+            regex = compile_patterns([pattern])
+            assert should_process_file(file_path, regex, None) is expected, (
+                file_path,
+                pattern,
+            )
+
+    def test_compile_patterns_empty(self):
+        """Test that an empty pattern list compiles to None."""
+        assert compile_patterns([]) is None
+
+
+class TestParseArgs:
+    """Test command line parsing."""
+
+    def test_parse_args_forms(self):
+        """Test separate, attached and repeated option values."""
+        args = parse_args(
+            [
+                "a.py",
+                "--template=t.txt",
+                "-c",
+                "Test Corp",
+                "-i*.py",
+                "-i=*.ts",
+                "--include",
+                "*.js",
+                "--exclude=tests/*",
+                "--cache",
+                "b.py",
+                "--",
+                "--weird-name.py",
+            ]
+        )
+
+        assert args.files == ["a.py", "b.py", "--weird-name.py"]
+        assert args.template == "t.txt"
+        assert args.copyright_holder == "Test Corp"
+        assert args.include == ["*.py", "*.ts", "*.js"]
+        assert args.exclude == ["tests/*"]
+        assert args.cache is True
+
+    def test_parse_args_defaults(self):
+        """Test defaults for optional arguments."""
+        args = parse_args(["-t", "t.txt", "-c", "Test Corp", "--no-cache"])
+
+        assert args.files == []
+        assert args.include == []
+        assert args.exclude == []
+        assert args.cache is False
+
+    def test_parse_args_abbreviations(self):
+        """Test that long options accept unique prefixes like argparse."""
+        args = parse_args(
+            ["--temp", "t.txt", "--copyright=Test Corp", "--inc", "*.py", "--cach"]
+        )
+
+        assert args.template == "t.txt"
+        assert args.copyright_holder == "Test Corp"
+        assert args.include == ["*.py"]
+        assert args.cache is True
+
+    def test_parse_args_ambiguous_abbreviation(self, capsys):
+        """Test that an ambiguous prefix is a usage error."""
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args(["-t", "t.txt", "--c", "Test Corp"])
+
+        assert exc_info.value.code == 2
+        assert "could match --copyright-holder, --cache" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["a.py"],
+            ["-t", "t.txt", "a.py"],
+            ["-t", "t.txt", "-c", "Test Corp", "--bogus"],
+            ["-t", "t.txt", "-c", "Test Corp", "--cache=yes"],
+            ["-t", "t.txt", "-c"],
+        ],
+    )
+    def test_parse_args_usage_errors(self, argv, capsys):
+        """Test that usage errors exit with status 2 like argparse."""
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args(argv)
+
+        assert exc_info.value.code == 2
+        assert "usage:" in capsys.readouterr().err
+
+    def test_parse_args_help(self, capsys):
+        """Test that --help prints usage and exits successfully."""
+        with pytest.raises(SystemExit) as exc_info:
+            parse_args(["--he"])
+
+        assert exc_info.value.code == 0
+        assert "--copyright-holder" in capsys.readouterr().out
 
 
 class TestMain:
@@ -183,6 +366,216 @@ class TestMain:
         # Should return 0 when no files are modified
         assert result == 0
 
+    @pytest.mark.parametrize("parallel_min_files", [1000, 1])
+    def test_main_processes_many_files(self, capsys, monkeypatch, parallel_min_files):
+        """Test that every file is processed, serially and concurrently."""
+        monkeypatch.setattr(
+            "license_header_hook.PARALLEL_MIN_FILES", parallel_min_files
+        )
+        monkeypatch.setattr("os.cpu_count", lambda: 4)
+        files = []
+        for i in range(40):
+            ext = ".py" if i % 2 else ".js"
+            path = os.path.join(self.temp_dir, f"file{i}{ext}")
+            with open(path, "w") as f:
+                f.write(f"x = {i}\n")
+            files.append(path)
+
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            *files,
+        ]
+
+        with patch("sys.argv", test_args):
+            assert main() == 1
+
+        assert "Modified 40 files" in capsys.readouterr().out
+        for i, path in enumerate(files):
+            with open(path) as f:
+                content = f.read()
+            assert "Test Corp" in content
+            assert content.endswith(f"x = {i}\n")
+
+    def test_main_skips_non_regular_files(self):
+        """Test that missing paths and directories are skipped."""
+        directory = os.path.join(self.temp_dir, "pkg.py")
+        os.mkdir(directory)
+        empty_file = os.path.join(self.temp_dir, "__init__.py")
+        open(empty_file, "w").close()
+
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            directory,
+            os.path.join(self.temp_dir, "missing.py"),
+            empty_file,
+        ]
+
+        with patch("sys.argv", test_args):
+            with patch.object(LicenseHeaderManager, "update_file") as process:
+                process.return_value = FileStatus.UPDATED
+                assert main() == 1
+
+        # Empty files still get a header
+        process.assert_called_once_with(empty_file)
+
+    def test_main_deduplicates_files(self):
+        """Test that a file passed several times is only processed once."""
+        alias = os.path.join(self.temp_dir, ".", "test.py")
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            self.test_file,
+            alias,
+            self.test_file,
+        ]
+
+        with patch("sys.argv", test_args):
+            with patch.object(LicenseHeaderManager, "update_file") as process:
+                process.return_value = FileStatus.UPDATED
+                assert main() == 1
+
+        process.assert_called_once_with(self.test_file)
+
+    def test_main_cache_skips_unchanged_files(self, monkeypatch):
+        """Test that --cache skips files unchanged since the last run."""
+        monkeypatch.chdir(self.temp_dir)
+        os.mkdir(".git")
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            "--cache",
+            self.test_file,
+        ]
+
+        with patch("sys.argv", test_args):
+            assert main() == 1  # Header added, not cached yet
+            assert main() == 0  # Header current, now cached
+            with patch.object(LicenseHeaderManager, "update_file") as process:
+                assert main() == 0
+            process.assert_not_called()
+
+        assert os.listdir(os.path.dirname(os.path.join(".git", CACHE_NAME))) == [
+            os.path.basename(CACHE_NAME)
+        ]
+
+        # Touching the file invalidates its entry
+        with open(self.test_file, "a") as f:
+            f.write("print('more')\n")
+        with patch("sys.argv", test_args):
+            with patch.object(LicenseHeaderManager, "update_file") as process:
+                process.return_value = FileStatus.CURRENT
+                main()
+            process.assert_called_once_with(self.test_file)
+
+    def test_main_cache_drops_deleted_files(self, monkeypatch):
+        """Test that entries for files that no longer exist are pruned."""
+        monkeypatch.chdir(self.temp_dir)
+        os.mkdir(".git")
+        other_file = os.path.join(self.temp_dir, "other.py")
+        with open(other_file, "w") as f:
+            f.write("x = 1\n")
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            "--cache",
+        ]
+
+        with patch("sys.argv", [*test_args, self.test_file, other_file]):
+            assert main() == 1
+            assert main() == 0
+
+        os.remove(other_file)
+        os.utime(self.test_file, ns=(0, 0))
+        with patch("sys.argv", [*test_args, self.test_file]):
+            assert main() == 0
+
+        with open(os.path.join(".git", CACHE_NAME)) as f:
+            assert list(json.load(f)["files"]) == [self.test_file]
+
+    def test_main_cache_in_worktree(self, monkeypatch):
+        """Test that --cache follows a .git file to the worktree's git directory."""
+        monkeypatch.chdir(self.temp_dir)
+        git_dir = os.path.join(self.temp_dir, "main.git", "worktrees", "wt")
+        os.makedirs(git_dir)
+        with open(".git", "w") as f:
+            f.write(f"gitdir: {git_dir}\n")
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            "--cache",
+            self.test_file,
+        ]
+
+        with patch("sys.argv", test_args):
+            assert main() == 1
+            assert main() == 0
+            with patch.object(LicenseHeaderManager, "update_file") as process:
+                assert main() == 0
+            process.assert_not_called()
+
+        assert os.path.isfile(os.path.join(git_dir, CACHE_NAME))
+
+    def test_main_cache_does_not_record_failures(self, monkeypatch, capsys):
+        """Test that files that could not be updated are not cached."""
+        monkeypatch.chdir(self.temp_dir)
+        os.mkdir(".git")
+        test_args = [
+            "license_header_hook.py",
+            "--template",
+            self.template_file,
+            "--copyright-holder",
+            "Test Corp",
+            "--cache",
+            self.test_file,
+        ]
+
+        with patch("sys.argv", test_args):
+            with patch(
+                "license_header_hook._write_text_atomic", side_effect=OSError("boom")
+            ):
+                assert main() == 0
+            assert "Error writing" in capsys.readouterr().out
+
+            # The failed file is retried and fixed on the next run
+            assert main() == 1
+
+        with open(self.test_file) as f:
+            assert "Test Corp" in f.read()
+
+    def test_update_file_reports_status(self):
+        """Test that update_file tells current files apart from failures."""
+        manager = LicenseHeaderManager(
+            self.template_file, "Test Corp", CommentRegistry()
+        )
+        bad_file = os.path.join(self.temp_dir, "latin1.py")
+        with open(bad_file, "wb") as f:
+            f.write(b"x = '\xff'\n")
+
+        assert manager.update_file(self.test_file) is FileStatus.UPDATED
+        assert manager.update_file(self.test_file) is FileStatus.CURRENT
+        assert manager.update_file(bad_file) is FileStatus.FAILED
+        assert manager.update_file(self.template_file) is FileStatus.SKIPPED
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -288,6 +681,32 @@ class TestLicenseHeaderManagerAdvanced:
         assert "Test Corp" in content
         assert str(self.manager.current_year) in content
 
+    def test_process_file_keeps_permissions(self):
+        """Test that rewriting a file keeps its mode and leaves no temp files."""
+        test_file = os.path.join(self.temp_dir, "run.sh")
+
+        with open(test_file, "w") as f:
+            f.write("#!/bin/sh\necho hello\n")
+        os.chmod(test_file, 0o755)
+
+        assert self.manager.process_file(test_file) is True
+        assert stat.S_IMODE(os.stat(test_file).st_mode) == 0o755
+        assert set(os.listdir(self.temp_dir)) == {"template.txt", "run.sh"}
+
+    def test_process_file_crlf_line_endings(self):
+        """Test that CRLF files are normalized like text-mode reads."""
+        test_file = os.path.join(self.temp_dir, "crlf.py")
+
+        with open(test_file, "wb") as f:
+            f.write(b"print('hello')\r\n")
+
+        assert self.manager.process_file(test_file) is True
+        with open(test_file, "rb") as f:
+            content = f.read()
+
+        assert b"\r" not in content
+        assert content.endswith(b"\nprint('hello')\n")
+
     def test_process_file_multiline_comments(self):
         """Test processing file with multi-line comment style."""
         test_file = os.path.join(self.temp_dir, "test.js")
@@ -350,6 +769,14 @@ print('hello')
         assert header is not None
         assert "Old Corp" in header
 
+    def test_extract_existing_header_indented_and_blank_lines(self):
+        """Test that indented markers and whitespace-only lines are handled."""
+        content = "  # Copyright (c) 2020 Old Corp\n   \n# License text\nx = 1\n"
+        comment_style = {"start": "#", "middle": "#", "end": "#"}
+
+        header = self.manager.extract_existing_header(content, comment_style)
+        assert header == "# Copyright (c) 2020 Old Corp\n# License text"
+
     def test_extract_existing_header_with_shebang(self):
         """Test extracting header from file with shebang."""
         content = """#!/usr/bin/env python3
@@ -402,6 +829,46 @@ print('hello')
         assert "Old Corp" not in result
         assert "print('hello')" in result
 
+    def test_remove_existing_header_large_file(self):
+        """Test that content beyond the scanned header region is kept intact."""
+        body = "".join(f"print({i})\n" for i in range(MAX_HEADER_LINES * 3))
+        content = "# Copyright (c) 2020 Old Corp\n# License text\n\n" + body
+        comment_style = {"start": "#", "middle": "#", "end": "#"}
+
+        result = self.manager.remove_existing_header(content, comment_style)
+        assert result == body
+
+    def test_process_file_replaces_header_longer_than_scan_limit(self):
+        """Test that a leading comment longer than MAX_HEADER_LINES is replaced."""
+        doc = "".join(f" * doc line {i}\n" for i in range(MAX_HEADER_LINES + 44))
+        body = "int main(void) { return 0; }\n"
+        test_file = os.path.join(self.temp_dir, "long.c")
+        with open(test_file, "w") as f:
+            f.write("/*\n" + doc + " */\n\n" + body)
+
+        assert self.manager.process_file(test_file) is True
+        with open(test_file) as f:
+            content = f.read()
+
+        header = self.manager.get_header(self.registry.get_comment_style(test_file))
+        assert content == header + "\n" + body
+
+    def test_remove_existing_header_single_line_longer_than_scan_limit(self):
+        """Test that a long run of single-line comments is removed entirely."""
+        run = "".join(f"# line {i}\n" for i in range(MAX_HEADER_LINES + 44))
+        comment_style = {"start": "#", "middle": "#", "end": "#"}
+
+        result = self.manager.remove_existing_header(run + "\nx = 1\n", comment_style)
+        assert result == "x = 1\n"
+
+    def test_remove_existing_header_after_unicode_blank_lines(self):
+        """Test that lines of non-ASCII whitespace count as blank."""
+        content = "\xa0\n\x1c\n# Copyright (c) 2020 Old Corp\n\nx = 1\n"
+        comment_style = {"start": "#", "middle": "#", "end": "#"}
+
+        result = self.manager.remove_existing_header(content, comment_style)
+        assert result == "x = 1\n"
+
     def test_process_file_no_change_when_header_correct(self):
         """Test that file is not modified when header is already correct."""
         test_file = os.path.join(self.temp_dir, "correct_header.py")
@@ -427,6 +894,76 @@ print('hello')
         new_stat = os.stat(test_file)
         assert new_stat.st_mtime == original_stat.st_mtime
 
+    def test_has_current_header(self):
+        """Test the fast check for an up-to-date header."""
+        comment_style = self.registry.get_comment_style("test.py")
+        header = self.manager.get_header_bytes(comment_style)
+
+        def check(content: bytes) -> bool:
+            return self.manager.has_current_header(content, comment_style)
+
+        assert check(header + b"\nprint(1)\n")
+        assert check(header + b"\n\n# Regular comment\n")
+        assert check(b"#!/bin/sh\n" + header + b"\n")
+        assert not check(header)
+        assert not check(header + b"2\n")
+        assert not check(b"\n" + header + b"\n")
+        assert not check(b"#!/bin/sh")
+        # Stale extra header lines must go through the full rewrite
+        assert not check(header + b"\n# Licensed under the Old License v1\n")
+
+    def test_process_file_writes_platform_line_endings(self, monkeypatch):
+        """Test that rewritten files use os.linesep like text-mode writes."""
+        monkeypatch.setattr("os.linesep", "\r\n")
+        test_file = os.path.join(self.temp_dir, "crlf.py")
+        header = self.manager.get_header(self.registry.get_comment_style(test_file))
+
+        with open(test_file, "wb") as f:
+            f.write(b"x = 1\r\ny = 2\r\n")
+
+        assert self.manager.process_file(test_file) is True
+        with open(test_file, "rb") as f:
+            expected = f"{header}\nx = 1\ny = 2\n".replace("\n", "\r\n")
+            assert f.read() == expected.encode()
+
+        # The rewritten file is recognized as current
+        assert self.manager.process_file(test_file) is False
+
+    def test_process_file_removes_stale_extra_header_lines(self):
+        """Test that a header with leftover old lines is rewritten."""
+        test_file = os.path.join(self.temp_dir, "stale.py")
+        header = self.manager.get_header(self.registry.get_comment_style(test_file))
+
+        with open(test_file, "w") as f:
+            f.write(f"{header}\n# Licensed under the Old License v1\n\nx = 1\n")
+
+        assert self.manager.process_file(test_file) is True
+        with open(test_file) as f:
+            assert f.read() == f"{header}\nx = 1\n"
+
+    def test_get_header_bytes(self):
+        """Test that the encoded header matches the text header."""
+        comment_style = self.registry.get_comment_style("test.py")
+        header_bytes = self.manager.get_header_bytes(comment_style)
+
+        assert header_bytes == self.manager.get_header(comment_style).encode()
+        assert self.manager.get_header_bytes(comment_style) is header_bytes
+
+    def test_process_file_no_change_with_shebang_and_correct_header(self):
+        """Test that a shebang file with the current header is left untouched."""
+        test_file = os.path.join(self.temp_dir, "script.py")
+        correct_header = self.manager.get_header(
+            self.registry.get_comment_style(test_file)
+        )
+        original = f"#!/usr/bin/env python3\n{correct_header}\n\nprint('hello')\n"
+
+        with open(test_file, "w") as f:
+            f.write(original)
+
+        assert self.manager.process_file(test_file) is False
+        with open(test_file) as f:
+            assert f.read() == original
+
     def test_process_file_preserves_non_header_comments_single_line(self):
         """Test that non-header comments are preserved in single-line comment files."""
         test_file = os.path.join(self.temp_dir, "preserve_comments.py")